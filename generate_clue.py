@@ -1,86 +1,334 @@
 from __future__ import annotations
 
-from collections import defaultdict
+import hashlib
+import json
+import mmap
+import os
+import re
+import struct
+import time
+from array import array
 from pathlib import Path
-from typing import Dict, List, Optional, Set, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 MIN_LEN = 4
 API_URL = "https://www.dailyscroggle.com/api/scroggle/puzzle"
+API_CACHE_FILE = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "scroggle" / "puzzle.json"
+API_CACHE_TTL = 10 * 60
 WORDS_FILE = Path(__file__).resolve().parent / "cleaned_words.txt"
-
-
-class Node:
-    __slots__ = ("children", "terminal")
-
-    def __init__(self) -> None:
-        self.children: Dict[str, "Node"] = {}
-        self.terminal = False
+CACHE_FILE = WORDS_FILE.with_suffix(".trie")
+# One word per line (LF or CRLF), surrounding blanks ignored.
+WORD_LINE = re.compile(rb"^[ \t]*([a-z]{%d,})[ \t\r]*$" % MIN_LEN, re.MULTILINE | re.IGNORECASE)
+# Source size and BLAKE2b digest, MIN_LEN, node count; followed by child,
+# terminal, child_mask. Content-keyed so a fresh git checkout still hits.
+CACHE_HEADER = struct.Struct("<q16sqq")
+NO_CHILDREN = array("i", [-1] * 26)
+LOWERCASE = bytes.maketrans(b"ABCDEFGHIJKLMNOPQRSTUVWXYZ", b"abcdefghijklmnopqrstuvwxyz")
+HASH_MUL = 1000003
+HASH_MASK = (1 << 64) - 1
+FIB_MUL = 0x9E3779B97F4A7C15
+U_CODE = ord("u") - 97
+CellInfo = Tuple[int, bool, int, int, Tuple[Tuple[int, int], ...]]
+PREFIXES = tuple(chr(i // 26 + 97) + chr(i % 26 + 97) for i in range(676))
+
+
+# One keep-alive connection to the API, with retries on transient gateway errors.
+SESSION = requests.Session()
+SESSION.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=1,
+        pool_maxsize=1,
+        max_retries=Retry(total=3, backoff_factor=0.2, status_forcelist=[502, 503, 504]),
+    ),
+)
 
 
 class Trie:
-    __slots__ = ("root",)
+    """Flat trie: node ``n`` owns ``child[n * 26 : n * 26 + 26]``, -1 meaning no edge."""
+
+    __slots__ = ("child", "terminal", "child_mask")
 
     def __init__(self) -> None:
-        self.root = Node()
+        self.child = array("i", [-1] * 26)
+        self.terminal = bytearray(1)
+        self.child_mask = array("i", [0])
 
     def add(self, s: str) -> None:
-        n = self.root
+        child = self.child
+        n = 0
         for ch in s:
-            nxt = n.children.get(ch)
-            if nxt is None:
-                nxt = Node()
-                n.children[ch] = nxt
+            li = ord(ch) - 97
+            i = n * 26 + li
+            nxt = child[i]
+            if nxt < 0:
+                nxt = len(self.terminal)
+                child[i] = nxt
+                child.extend(NO_CHILDREN)
+                self.terminal.append(0)
+                self.child_mask[n] |= 1 << li
+                self.child_mask.append(0)
             n = nxt
-        n.terminal = True
-
-    def step(self, n: Node, ch: str) -> Optional[Node]:
-        return n.children.get(ch)
+        self.terminal[n] = 1
+
+    def minimized(self) -> "Trie":
+        """Return the equivalent minimal DAWG in the same flat layout.
+
+        Nodes with the same terminal flag and the same (letter, child) edges
+        accept the same suffixes and are merged bottom-up. Every child is
+        created after its parent, so walking ids in reverse sees children
+        first. Classes are renumbered in reverse so the root stays node 0.
+
+        Search speed is the same as the plain trie; the point is the ~6x
+        smaller cache file that CI restores, paid for once per word list.
+        """
+        child = self.child
+        terminal = self.terminal
+        child_mask = self.child_mask
+        size = len(terminal)
+        cls = array("i", [0]) * size
+        register: Dict[Tuple[int, ...], int] = {}
+        reps: List[int] = []
+        for n in range(size - 1, -1, -1):
+            sig = [terminal[n]]
+            m = child_mask[n]
+            while m:
+                li = (m & -m).bit_length() - 1
+                m &= m - 1
+                sig.append(li)
+                sig.append(cls[child[n * 26 + li]])
+            key = tuple(sig)
+            c = register.get(key)
+            if c is None:
+                c = register[key] = len(reps)
+                reps.append(n)
+            cls[n] = c
+
+        top = len(reps) - 1
+        out = Trie.__new__(Trie)
+        out.child = array("i", [-1]) * (len(reps) * 26)
+        out.terminal = bytearray(len(reps))
+        out.child_mask = array("i", [0]) * len(reps)
+        for c, n in enumerate(reps):
+            new = top - c
+            out.terminal[new] = terminal[n]
+            out.child_mask[new] = m = child_mask[n]
+            while m:
+                li = (m & -m).bit_length() - 1
+                m &= m - 1
+                out.child[new * 26 + li] = top - cls[child[n * 26 + li]]
+        return out
+
+
+class HashSet:
+    """Open-addressed set of 64-bit word hashes with linear probing.
+
+    A zero slot marks an empty bucket, so a zero hash is tracked by a flag.
+    """
+
+    __slots__ = ("table", "mask", "shift", "size", "has_zero")
+
+    def __init__(self, bits: int = 10) -> None:
+        self.table = array("Q", [0]) * (1 << bits)
+        self.mask = (1 << bits) - 1
+        self.shift = 64 - bits
+        self.size = 0
+        self.has_zero = False
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __iter__(self) -> Iterator[int]:
+        if self.has_zero:
+            yield 0
+        for h in self.table:
+            if h:
+                yield h
+
+    def add(self, h: int) -> bool:
+        """Insert ``h``; return True if it was not already present."""
+        if not h:
+            if self.has_zero:
+                return False
+            self.has_zero = True
+            self.size += 1
+            return True
+        table = self.table
+        mask = self.mask
+        # Fibonacci hashing: the rolling hash's low bits are poorly mixed.
+        i = ((h * FIB_MUL) & HASH_MASK) >> self.shift
+        while table[i]:
+            if table[i] == h:
+                return False
+            i = (i + 1) & mask
+        table[i] = h
+        self.size += 1
+        if self.size * 2 > mask:
+            self._grow()
+        return True
+
+    def _grow(self) -> None:
+        old = self.table
+        bits = 64 - self.shift + 1
+        self.table = array("Q", [0]) * (1 << bits)
+        self.mask = (1 << bits) - 1
+        self.shift = 64 - bits
+        self.size = int(self.has_zero)
+        for h in old:
+            if h:
+                self.add(h)
+
+
+def build_trie(path: Path) -> Trie:
+    t = Trie()
+    with path.open("rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return t
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for m in WORD_LINE.finditer(mm):
+                t.add(m.group(1).lower().decode("ascii"))
+    return t.minimized()
+
+
+def read_trie_cache(path: Path, source: Tuple[int, bytes]) -> Optional[Trie]:
+    try:
+        with path.open("rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    if len(mm) < CACHE_HEADER.size:
+        return None
+    src_size, src_digest, min_len, nodes = CACHE_HEADER.unpack_from(mm)
+    if (src_size, src_digest) != source or min_len != MIN_LEN:
+        return None
+    if len(mm) != CACHE_HEADER.size + nodes * (26 * 4 + 1 + 4):
+        return None
+
+    t = Trie.__new__(Trie)
+    view = memoryview(mm)
+    pos = CACHE_HEADER.size
+    t.child = view[pos : pos + nodes * 26 * 4].cast("i")
+    pos += nodes * 26 * 4
+    t.terminal = view[pos : pos + nodes]
+    pos += nodes
+    t.child_mask = view[pos : pos + nodes * 4].cast("i")
+    return t
 
 
-def load_trie(path: Path) -> Trie:
-    t = Trie()
-    with path.open("r", encoding="utf-8") as f:
-        for line in f:
-            s = line.strip().lower()
-            if len(s) >= MIN_LEN and s.isalpha():
-                t.add(s)
+def write_trie_cache(path: Path, trie: Trie, source: Tuple[int, bytes]) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    try:
+        with tmp.open("wb") as f:
+            f.write(CACHE_HEADER.pack(*source, MIN_LEN, len(trie.terminal)))
+            trie.child.tofile(f)
+            f.write(trie.terminal)
+            trie.child_mask.tofile(f)
+        os.replace(tmp, path)
+    except OSError:
+        # The cache is only an optimisation; a read-only checkout still works.
+        tmp.unlink(missing_ok=True)
+
+
+def source_fingerprint(path: Path) -> Tuple[int, bytes]:
+    data = path.read_bytes()
+    return len(data), hashlib.blake2b(data, digest_size=16).digest()
+
+
+def load_trie(path: Path, cache_path: Path = CACHE_FILE) -> Trie:
+    source = source_fingerprint(path)
+    t = read_trie_cache(cache_path, source)
+    if t is None:
+        t = build_trie(path)
+        write_trie_cache(cache_path, t, source)
+        # Drop the heap-built arrays in favour of the read-only mapping, so a
+        # cold run holds the same single, page-cache-backed arena as a warm one.
+        t = read_trie_cache(cache_path, source) or t
     return t
 
 
+def read_api_cache(path: Path) -> Optional[dict]:
+    try:
+        entry = json.loads(path.read_text(encoding="utf-8"))
+        entry["fetched"] = float(entry["fetched"])
+        s = entry["response"]["LetterList"]
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+    return entry if s else None
+
+
+def write_api_cache(path: Path, entry: dict) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp.write_text(json.dumps(entry), encoding="utf-8")
+        os.replace(tmp, path)
+    except OSError:
+        tmp.unlink(missing_ok=True)
+
+
 def fetch_letterlist() -> str:
-    r = requests.get(API_URL, timeout=15)
-    r.raise_for_status()
-    j = r.json()
+    # The site's rollover time is unknown, so a cached response is only reused
+    # for API_CACHE_TTL seconds; after that it is revalidated with whatever
+    # validators the server sent. SCROGGLE_NO_CACHE=1 bypasses the cache.
+    use_cache = not os.environ.get("SCROGGLE_NO_CACHE")
+    entry = read_api_cache(API_CACHE_FILE) if use_cache else None
+    headers: Dict[str, str] = {}
+    if entry is not None:
+        if 0 <= time.time() - entry["fetched"] < API_CACHE_TTL:
+            return entry["response"]["LetterList"]
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+    r = SESSION.get(API_URL, timeout=15, headers=headers)
+    if entry is not None and r.status_code == 304:
+        j = entry["response"]
+    else:
+        r.raise_for_status()
+        j = r.json()
     s = j.get("LetterList", "")
     if not s:
         raise RuntimeError("Missing LetterList in API response")
+    if use_cache:
+        write_api_cache(
+            API_CACHE_FILE,
+            {
+                "fetched": time.time(),
+                "etag": r.headers.get("ETag") or (entry or {}).get("etag"),
+                "last_modified": r.headers.get("Last-Modified") or (entry or {}).get("last_modified"),
+                "response": j,
+            },
+        )
     return s
 
 
 def parse_grid(letter_list_str: str) -> List[List[str]]:
-    chunks = letter_list_str.split()
+    try:
+        data = letter_list_str.encode("ascii").translate(LOWERCASE)
+    except UnicodeEncodeError:
+        raise RuntimeError("Unexpected puzzle format (non-ASCII tiles)") from None
+    chunks = data.split()
     if len(chunks) != 7:
         raise RuntimeError("Unexpected puzzle format (cols != 7)")
 
-    cols = [c.split(",") for c in chunks]
+    cols = [c.split(b",") for c in chunks]
     if any(len(col) != 7 for col in cols):
         raise RuntimeError("Unexpected puzzle format (rows != 7)")
 
-    flat: List[str] = []
-    for col in cols:
-        for tile in col:
-            t = tile.strip().upper()
-            flat.append("Q" if t in ("Q", "QU") else t)
-
     grid = [["" for _ in range(7)] for _ in range(7)]
-    idx = 0
-    for c in range(7):
-        for r in range(7):
-            ch = flat[idx]
-            idx += 1
-            grid[r][c] = "qu" if ch == "Q" else ch.lower()
+    for c, col in enumerate(cols):
+        for r, tile in enumerate(col):
+            if tile == b"q" or tile == b"qu":
+                grid[r][c] = "qu"
+            elif len(tile) == 1 and tile.isalpha():
+                grid[r][c] = tile.decode("ascii")
+            else:
+                raise RuntimeError(f"Unexpected puzzle format (tile {tile!r})")
     return grid
 
 
@@ -93,58 +341,123 @@ def neighbor_offsets(col: int) -> List[Tuple[int, int]]:
     return base
 
 
-def explore(
-    grid: List[List[str]],
-    trie: Trie,
-    r: int,
-    c: int,
-    node: Node,
-    buf: List[str],
-    seen: Set[str],
-    counts: defaultdict[str, int],
-    visited: List[List[bool]],
-) -> None:
-    tile = grid[r][c]
-    cur = node
-    for ch in tile:
-        cur = trie.step(cur, ch)
-        if cur is None:
-            return
-
-    visited[r][c] = True
-    buf.append(tile)
-
-    if cur.terminal:
-        s = "".join(buf)
-        if len(s) >= MIN_LEN and s not in seen:
-            seen.add(s)
-            counts[s[:2]] += 1
-
-    for dr, dc in neighbor_offsets(c):
-        nr, nc = r + dr, c + dc
-        if 0 <= nr < 7 and 0 <= nc < 7 and not visited[nr][nc]:
-            explore(grid, trie, nr, nc, cur, buf, seen, counts, visited)
-
-    buf.pop()
-    visited[r][c] = False
-
-
-def build_clue(counts: defaultdict[str, int]) -> str:
-    parts = [f"{counts[k]}{k}" for k in sorted(counts.keys())]
+NEIGHBORS = tuple(tuple(neighbor_offsets(c)) for c in range(7))
+CELL_NEIGHBORS: Tuple[Tuple[Tuple[Tuple[int, int], ...], ...], ...] = tuple(
+    tuple(
+        tuple(
+            (r + dr, c + dc)
+            for dr, dc in NEIGHBORS[c]
+            if 0 <= r + dr < 7 and 0 <= c + dc < 7
+        )
+        for c in range(7)
+    )
+    for r in range(7)
+)
+
+
+BIT = tuple(tuple(1 << (r * 7 + c) for c in range(7)) for r in range(7))
+ALL_CELLS = tuple((r, c) for r in range(7) for c in range(7))
+# Each popped frame pushes at most 6 neighbors and a path visits each cell once.
+STACK_SIZE = 49 * 6
+
+
+def tile_codes(grid: List[List[str]]) -> Tuple[List[List[int]], List[List[bool]]]:
+    # One letter code per tile; "qu" tiles keep the q code and are flagged so
+    # the DFS follows the extra u edge inline.
+    codes = [[ord(tile[0]) - 97 for tile in row] for row in grid]
+    is_qu = [[tile == "qu" for tile in row] for row in grid]
+    return codes, is_qu
+
+
+def neighbor_letters(codes: List[List[int]]) -> List[List[int]]:
+    # Bitmask of the first letters of each cell's neighbors: a node whose
+    # child_mask misses all of them cannot be extended from that cell.
+    near = [[0] * 7 for _ in range(7)]
+    for r in range(7):
+        for c in range(7):
+            for nr, nc in CELL_NEIGHBORS[r][c]:
+                near[r][c] |= 1 << codes[nr][nc]
+    return near
+
+
+def cell_table(grid: List[List[str]]) -> Tuple[CellInfo, ...]:
+    # Everything the DFS needs about a cell, specialised to this grid and
+    # indexed by k = r * 7 + c: letter code, qu flag, visited bit, neighbor
+    # letter mask and (k, bit) pairs for the in-bounds neighbors.
+    codes, is_qu = tile_codes(grid)
+    near = neighbor_letters(codes)
+    return tuple(
+        (
+            codes[r][c],
+            is_qu[r][c],
+            BIT[r][c],
+            near[r][c],
+            tuple((nr * 7 + nc, BIT[nr][nc]) for nr, nc in CELL_NEIGHBORS[r][c]),
+        )
+        for r, c in ALL_CELLS
+    )
+
+
+def search(grid: List[List[str]], trie: Trie) -> Tuple[HashSet, array]:
+    # Iterative DFS over an explicit, preallocated stack of
+    # (k, node, visited, h, n, key) frames, ``k`` being the flat cell index.
+    # Words are never materialised: ``h`` is a rolling hash of the letters
+    # consumed so far (used for dedupe), ``n`` the letter count and ``key``
+    # the two-letter prefix code.
+    cells = cell_table(grid)
+    child = trie.child
+    terminal = trie.terminal
+    child_mask = trie.child_mask
+    counts = array("i", [0] * 676)
+    seen = HashSet()
+
+    stack: List[Optional[Tuple[int, int, int, int, int, int]]] = [None] * STACK_SIZE
+    for rr, cc in ALL_CELLS:
+        stack[0] = (rr * 7 + cc, 0, 0, 0, 0, 0)
+        sp = 1
+        while sp:
+            sp -= 1
+            k, cur, visited, h, n, key = stack[sp]  # type: ignore[misc]
+            li, qu, bit, nmask, nbrs = cells[k]
+            cur = child[cur * 26 + li]
+            if cur < 0:
+                continue
+            h = (h * HASH_MUL + li + 1) & HASH_MASK
+            if n < 2:
+                key = key * 26 + li
+            n += 1
+            if qu:
+                cur = child[cur * 26 + U_CODE]
+                if cur < 0:
+                    continue
+                h = (h * HASH_MUL + U_CODE + 1) & HASH_MASK
+                if n < 2:
+                    key = key * 26 + U_CODE
+                n += 1
+
+            visited |= bit
+
+            if terminal[cur] and n >= MIN_LEN and seen.add(h):
+                counts[key] += 1
+
+            if child_mask[cur] & nmask:
+                for nk, nbit in nbrs:
+                    if not visited & nbit:
+                        stack[sp] = (nk, cur, visited, h, n, key)
+                        sp += 1
+    return seen, counts
+
+
+def build_clue(counts: array) -> str:
+    # Index order is aa, ab, ..., zz, so the output is already alphabetical.
+    parts = [f"{counts[i]}{PREFIXES[i]}" for i in range(676) if counts[i]]
     return (" ".join(parts) + " ✔️") if parts else "✔️"
 
 
 def main() -> None:
     trie = load_trie(WORDS_FILE)
     grid = parse_grid(fetch_letterlist())
-
-    counts: defaultdict[str, int] = defaultdict(int)
-    seen: Set[str] = set()
-    visited = [[False] * 7 for _ in range(7)]
-
-    for rr in range(7):
-        for cc in range(7):
-            explore(grid, trie, rr, cc, trie.root, [], seen, counts, visited)
+    seen, counts = search(grid, trie)
 
     print(f"Total: {len(seen)}")
     print(build_clue(counts))
@@ -1,47 +1,239 @@
+import hashlib
+import json
+import mmap
+import os
+import re
+import struct
 import sys
-from collections import defaultdict
+import time
+from array import array
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 TERM_FILEPATH = "cleaned_words.txt"
+CACHE_FILEPATH = "cleaned_words.trie"
+# source size and BLAKE2b digest, MIN_LEN, node count; then child, terminal,
+# child_mask (keyed on content so a fresh checkout still hits)
+CACHE_HEADER = struct.Struct("<q16sqq")
 MIN_LEN = 4
 API_URL = "https://www.dailyscroggle.com/api/scroggle/puzzle"
+API_CACHE_FILE = os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"), "scroggle", "puzzle.json")
+API_CACHE_TTL = 10 * 60
 OUTPUT_FILE = "clue.txt"
-
-
-class Node:
-    __slots__ = ("children", "terminal")
-    def __init__(self):
-        self.children = {}
-        self.terminal = False
+# one word per line (LF or CRLF), surrounding blanks ignored
+WORD_LINE = re.compile(rb"^[ \t]*([a-z]{%d,})[ \t\r]*$" % MIN_LEN, re.MULTILINE | re.IGNORECASE)
+NO_CHILDREN = array("i", [-1] * 26)
+LOWERCASE = bytes.maketrans(b"ABCDEFGHIJKLMNOPQRSTUVWXYZ", b"abcdefghijklmnopqrstuvwxyz")
+HASH_MUL = 1000003
+HASH_MASK = (1 << 64) - 1
+FIB_MUL = 0x9E3779B97F4A7C15
+U_CODE = ord("u") - 97
+PREFIXES = tuple(chr(i // 26 + 97) + chr(i % 26 + 97) for i in range(676))
+
+
+# one keep-alive connection to the API, retried on transient gateway errors
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(
+    pool_connections=1,
+    pool_maxsize=1,
+    max_retries=Retry(total=3, backoff_factor=0.2, status_forcelist=[502, 503, 504]),
+))
 
 
 class Tree:
-    __slots__ = ("root",)
+    # node n owns child[n * 26 : n * 26 + 26]; -1 means no edge
+    __slots__ = ("child", "terminal", "child_mask")
     def __init__(self):
-        self.root = Node()
+        self.child = array("i", [-1] * 26)
+        self.terminal = bytearray(1)
+        self.child_mask = array("i", [0])
 
     def add(self, s: str) -> None:
-        n = self.root
+        child = self.child
+        n = 0
         for ch in s:
-            nxt = n.children.get(ch)
-            if nxt is None:
-                nxt = Node()
-                n.children[ch] = nxt
+            li = ord(ch) - 97
+            i = n * 26 + li
+            nxt = child[i]
+            if nxt < 0:
+                nxt = len(self.terminal)
+                child[i] = nxt
+                child.extend(NO_CHILDREN)
+                self.terminal.append(0)
+                self.child_mask[n] |= 1 << li
+                self.child_mask.append(0)
             n = nxt
-        n.terminal = True
+        self.terminal[n] = 1
+
+    def minimized(self):
+        # merge nodes with the same terminal flag and (letter, child) edges
+        # into a minimal DAWG in the same flat layout; children are created
+        # after their parents, so walking ids in reverse sees them first, and
+        # classes are renumbered in reverse so the root stays node 0; search
+        # speed is unchanged, the point is a ~6x smaller cache file
+        child = self.child
+        terminal = self.terminal
+        child_mask = self.child_mask
+        size = len(terminal)
+        cls = array("i", [0]) * size
+        register = {}
+        reps = []
+        for n in range(size - 1, -1, -1):
+            sig = [terminal[n]]
+            m = child_mask[n]
+            while m:
+                li = (m & -m).bit_length() - 1
+                m &= m - 1
+                sig.append(li)
+                sig.append(cls[child[n * 26 + li]])
+            key = tuple(sig)
+            c = register.get(key)
+            if c is None:
+                c = register[key] = len(reps)
+                reps.append(n)
+            cls[n] = c
+
+        top = len(reps) - 1
+        out = Tree.__new__(Tree)
+        out.child = array("i", [-1]) * (len(reps) * 26)
+        out.terminal = bytearray(len(reps))
+        out.child_mask = array("i", [0]) * len(reps)
+        for c, n in enumerate(reps):
+            new = top - c
+            out.terminal[new] = terminal[n]
+            out.child_mask[new] = m = child_mask[n]
+            while m:
+                li = (m & -m).bit_length() - 1
+                m &= m - 1
+                out.child[new * 26 + li] = top - cls[child[n * 26 + li]]
+        return out
+
+
+class HashSet:
+    # open-addressed set of 64-bit word hashes with linear probing; a zero
+    # slot marks an empty bucket, so a zero hash is tracked by a flag
+    __slots__ = ("table", "mask", "shift", "size", "has_zero")
+    def __init__(self, bits: int = 10):
+        self.table = array("Q", [0]) * (1 << bits)
+        self.mask = (1 << bits) - 1
+        self.shift = 64 - bits
+        self.size = 0
+        self.has_zero = False
+
+    def __len__(self):
+        return self.size
+
+    def __iter__(self):
+        if self.has_zero:
+            yield 0
+        for h in self.table:
+            if h:
+                yield h
+
+    def add(self, h: int) -> bool:
+        # True if h was not already present
+        if not h:
+            if self.has_zero:
+                return False
+            self.has_zero = True
+            self.size += 1
+            return True
+        table = self.table
+        mask = self.mask
+        # Fibonacci hashing: the rolling hash's low bits are poorly mixed
+        i = ((h * FIB_MUL) & HASH_MASK) >> self.shift
+        while table[i]:
+            if table[i] == h:
+                return False
+            i = (i + 1) & mask
+        table[i] = h
+        self.size += 1
+        if self.size * 2 > mask:
+            self._grow()
+        return True
+
+    def _grow(self) -> None:
+        old = self.table
+        bits = 64 - self.shift + 1
+        self.table = array("Q", [0]) * (1 << bits)
+        self.mask = (1 << bits) - 1
+        self.shift = 64 - bits
+        self.size = int(self.has_zero)
+        for h in old:
+            if h:
+                self.add(h)
+
+
+def build_tree(path: str) -> Tree:
+    t = Tree()
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return t
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for m in WORD_LINE.finditer(mm):
+                t.add(m.group(1).lower().decode("ascii"))
+    return t.minimized()
+
 
-    def step(self, n: Node, ch: str):
-        return n.children.get(ch)
+def read_tree_cache(path: str, source):
+    try:
+        with open(path, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    if len(mm) < CACHE_HEADER.size:
+        return None
+    src_size, src_digest, min_len, nodes = CACHE_HEADER.unpack_from(mm)
+    if (src_size, src_digest) != source or min_len != MIN_LEN:
+        return None
+    if len(mm) != CACHE_HEADER.size + nodes * (26 * 4 + 1 + 4):
+        return None
+
+    t = Tree.__new__(Tree)
+    view = memoryview(mm)
+    pos = CACHE_HEADER.size
+    t.child = view[pos:pos + nodes * 26 * 4].cast("i")
+    pos += nodes * 26 * 4
+    t.terminal = view[pos:pos + nodes]
+    pos += nodes
+    t.child_mask = view[pos:pos + nodes * 4].cast("i")
+    return t
+
+
+def write_tree_cache(path: str, tree: Tree, source) -> None:
+    tmp = path + ".tmp"
+    try:
+        with open(tmp, "wb") as f:
+            f.write(CACHE_HEADER.pack(*source, MIN_LEN, len(tree.terminal)))
+            tree.child.tofile(f)
+            f.write(tree.terminal)
+            tree.child_mask.tofile(f)
+        os.replace(tmp, path)
+    except OSError:
+        # the cache is only an optimisation, carry on without it
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+
+
+def source_fingerprint(path: str):
+    with open(path, "rb") as f:
+        data = f.read()
+    return len(data), hashlib.blake2b(data, digest_size=16).digest()
 
 
 def load_tree(path: str) -> Tree:
-    t = Tree()
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            for line in f:
-                s = line.strip().lower()
-                if len(s) >= MIN_LEN and s.isalpha():
-                    t.add(s)
+        source = source_fingerprint(path)
+        t = read_tree_cache(CACHE_FILEPATH, source)
+        if t is None:
+            t = build_tree(path)
+            write_tree_cache(CACHE_FILEPATH, t, source)
+            # swap the heap-built arrays for the read-only mapping so a cold
+            # run holds the same single page-cache-backed arena as a warm one
+            t = read_tree_cache(CACHE_FILEPATH, source) or t
     except FileNotFoundError:
         sys.stdout.write(f"ERROR: missing {path}\n")
         sys.exit(1)
@@ -51,45 +243,97 @@ def load_tree(path: str) -> Tree:
     return t
 
 
+def read_api_cache(path: str):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            entry = json.load(f)
+        entry["fetched"] = float(entry["fetched"])
+        s = entry["response"]["LetterList"]
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+    return entry if s else None
+
+
+def write_api_cache(path: str, entry) -> None:
+    tmp = path + ".tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(entry, f)
+        os.replace(tmp, path)
+    except OSError:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+
+
 def fetch_letterlist() -> str:
+    # the site's rollover time is unknown, so a cached response is only reused
+    # for API_CACHE_TTL seconds and then revalidated with whatever validators
+    # the server sent; SCROGGLE_NO_CACHE=1 bypasses the cache
+    use_cache = not os.environ.get("SCROGGLE_NO_CACHE")
+    entry = read_api_cache(API_CACHE_FILE) if use_cache else None
+    headers = {}
+    if entry is not None:
+        if 0 <= time.time() - entry["fetched"] < API_CACHE_TTL:
+            return entry["response"]["LetterList"]
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+
     try:
-        r = requests.get(API_URL, timeout=10)
-        r.raise_for_status()
-        j = r.json()
+        r = SESSION.get(API_URL, timeout=10, headers=headers)
+        if entry is not None and r.status_code == 304:
+            j = entry["response"]
+        else:
+            r.raise_for_status()
+            j = r.json()
         s = j.get("LetterList", "")
         if not s:
             raise ValueError("missing LetterList")
-        return s
     except Exception:
         sys.stdout.write("ERROR: could not fetch puzzle\n")
         sys.exit(1)
 
+    if use_cache:
+        write_api_cache(API_CACHE_FILE, {
+            "fetched": time.time(),
+            "etag": r.headers.get("ETag") or (entry or {}).get("etag"),
+            "last_modified": r.headers.get("Last-Modified") or (entry or {}).get("last_modified"),
+            "response": j,
+        })
+    return s
+
 
 def parse_grid(letter_list_str: str):
-    chunks = letter_list_str.split()
+    try:
+        data = letter_list_str.encode("ascii").translate(LOWERCASE)
+    except UnicodeEncodeError:
+        sys.stdout.write("ERROR: unexpected puzzle format\n")
+        sys.exit(1)
+    chunks = data.split()
     if len(chunks) != 7:
         sys.stdout.write("ERROR: unexpected puzzle format\n")
         sys.exit(1)
 
-    cols = [c.split(",") for c in chunks]
+    cols = [c.split(b",") for c in chunks]
     for col in cols:
         if len(col) != 7:
             sys.stdout.write("ERROR: unexpected puzzle format\n")
             sys.exit(1)
 
-    flat = []
-    for col in cols:
-        for tile in col:
-            t = tile.strip().upper()
-            flat.append("Q" if t in ("Q", "QU") else t)
-
     grid = [["" for _ in range(7)] for _ in range(7)]
-    idx = 0
-    for c in range(7):
-        for r in range(7):
-            ch = flat[idx]
-            idx += 1
-            grid[r][c] = "qu" if ch == "Q" else ch.lower()
+    for c, col in enumerate(cols):
+        for r, tile in enumerate(col):
+            if tile == b"q" or tile == b"qu":
+                grid[r][c] = "qu"
+            elif len(tile) == 1 and tile.isalpha():
+                grid[r][c] = tile.decode("ascii")
+            else:
+                sys.stdout.write("ERROR: unexpected puzzle format\n")
+                sys.exit(1)
 
     return grid
 
@@ -103,68 +347,133 @@ def neighbor_offsets(col: int):
     return base
 
 
-def explore(grid, tree: Tree, r: int, c: int, node: Node, buf: list, seen: set, counts):
-    tile = grid[r][c]
-
-    cur = node
-    for ch in tile:
-        cur = tree.step(cur, ch)
-        if cur is None:
-            return
-
-    visited[r][c] = True
-    buf.append(tile)
-
-    if cur.terminal:
-        s = "".join(buf)
-        if len(s) >= MIN_LEN and s not in seen:
-            seen.add(s)
-            counts[s[:2]] += 1
-
-    for dr, dc in neighbor_offsets(c):
-        nr, nc = r + dr, c + dc
-        if 0 <= nr < 7 and 0 <= nc < 7 and not visited[nr][nc]:
-            explore(grid, tree, nr, nc, cur, buf, seen, counts)
-
-    buf.pop()
-    visited[r][c] = False
+NEIGHBORS = tuple(tuple(neighbor_offsets(c)) for c in range(7))
+# in-bounds neighbors of every cell, so the DFS needs no bounds checks
+CELL_NEIGHBORS = tuple(
+    tuple(
+        tuple((r + dr, c + dc) for dr, dc in NEIGHBORS[c] if 0 <= r + dr < 7 and 0 <= c + dc < 7)
+        for c in range(7)
+    )
+    for r in range(7)
+)
+
+
+BIT = tuple(tuple(1 << (r * 7 + c) for c in range(7)) for r in range(7))
+ALL_CELLS = tuple((r, c) for r in range(7) for c in range(7))
+# each popped frame pushes at most 6 neighbors; a path visits each cell once
+STACK_SIZE = 49 * 6
+
+
+def tile_codes(grid):
+    # one letter code per tile; "qu" tiles keep the q code and are flagged so
+    # the DFS follows the extra u edge inline
+    codes = [[ord(tile[0]) - 97 for tile in row] for row in grid]
+    is_qu = [[tile == "qu" for tile in row] for row in grid]
+    return codes, is_qu
+
+
+def neighbor_letters(codes):
+    # first-letter bitmask of each cell's neighbors; a node whose child_mask
+    # misses all of them cannot be extended from that cell
+    near = [[0] * 7 for _ in range(7)]
+    for r in range(7):
+        for c in range(7):
+            for nr, nc in CELL_NEIGHBORS[r][c]:
+                near[r][c] |= 1 << codes[nr][nc]
+    return near
+
+
+def cell_table(grid):
+    # everything the DFS needs about a cell, specialised to this grid and
+    # indexed by k = r * 7 + c: letter code, qu flag, visited bit, neighbor
+    # letter mask and (k, bit) pairs for the in-bounds neighbors
+    codes, is_qu = tile_codes(grid)
+    near = neighbor_letters(codes)
+    return tuple(
+        (codes[r][c], is_qu[r][c], BIT[r][c], near[r][c],
+         tuple((nr * 7 + nc, BIT[nr][nc]) for nr, nc in CELL_NEIGHBORS[r][c]))
+        for r, c in ALL_CELLS
+    )
+
+
+def search(grid, tree: Tree):
+    # iterative DFS over an explicit, preallocated stack of
+    # (k, node, visited, h, n, key) frames, k being the flat cell index;
+    # words are never built as strings: h is a rolling hash of the letters
+    # so far (dedupe), n the letter count and key the two-letter prefix code
+    cells = cell_table(grid)
+    child = tree.child
+    terminal = tree.terminal
+    child_mask = tree.child_mask
+    counts = array("i", [0] * 676)
+    seen = HashSet()
+
+    stack = [None] * STACK_SIZE
+    for rr, cc in ALL_CELLS:
+        stack[0] = (rr * 7 + cc, 0, 0, 0, 0, 0)
+        sp = 1
+        while sp:
+            sp -= 1
+            k, cur, visited, h, n, key = stack[sp]
+            li, qu, bit, nmask, nbrs = cells[k]
+            cur = child[cur * 26 + li]
+            if cur < 0:
+                continue
+            h = (h * HASH_MUL + li + 1) & HASH_MASK
+            if n < 2:
+                key = key * 26 + li
+            n += 1
+            if qu:
+                cur = child[cur * 26 + U_CODE]
+                if cur < 0:
+                    continue
+                h = (h * HASH_MUL + U_CODE + 1) & HASH_MASK
+                if n < 2:
+                    key = key * 26 + U_CODE
+                n += 1
+
+            visited |= bit
+
+            if terminal[cur] and n >= MIN_LEN and seen.add(h):
+                counts[key] += 1
+
+            if child_mask[cur] & nmask:
+                for nk, nbit in nbrs:
+                    if not visited & nbit:
+                        stack[sp] = (nk, cur, visited, h, n, key)
+                        sp += 1
+    return seen, counts
 
 
 def build_line(counts) -> str:
-    parts = [f"{counts[k]}{k}" for k in sorted(counts.keys())]
+    # index order is aa, ab, ..., zz, so the output is already alphabetical
+    parts = [f"{counts[i]}{PREFIXES[i]}" for i in range(676) if counts[i]]
     return (" ".join(parts) + " ✔️") if parts else "✔️"
 
 
 if __name__ == "__main__":
     tree = load_tree(TERM_FILEPATH)
     grid = parse_grid(fetch_letterlist())
-
-    counts = defaultdict(int)
-    seen = set()
-
-    visited = [[False] * 7 for _ in range(7)]
-
-    for rr in range(7):
-        for cc in range(7):
-            explore(grid, tree, rr, cc, tree.root, [], seen, counts)
+    seen, counts = search(grid, tree)
 
     total_line = f"Total: {len(seen)}"
     clue_line = build_line(counts)
+    payload = f"{total_line}\n{clue_line}\n"
 
     # Output: total on its own line, then the clue line
-    sys.stdout.write(total_line + "\n")
-    sys.stdout.write(clue_line + "\n")
+    sys.stdout.write(payload)
 
     # Also write both lines to a file
     try:
         with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
-            f.write(total_line + "\n")
-            f.write(clue_line + "\n")
-    except Exception:
+            f.write(payload)
+    except OSError:
         pass
 
-    # Keep the window open if you double-click the script
-    try:
-        input()
-    except EOFError:
-        pass
+    # Keep the window open if you double-click the script, but never block
+    # when run from a pipe, scheduler or another process
+    if sys.stdout.isatty() and sys.stdin and sys.stdin.isatty():
+        try:
+            input()
+        except EOFError:
+            pass
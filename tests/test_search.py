@@ -0,0 +1,103 @@
+"""Check the hashed DAWG search against a plain string-set DFS.
+
+Runs under pytest or directly: ``python tests/test_search.py``.
+"""
+
+import os
+import sys
+import tempfile
+from collections import Counter
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import generate_clue  # noqa: E402
+import scroggle_clue  # noqa: E402
+
+# Column-major LetterLists as served by the API; the second covers "Q", "Qu"
+# and a lowercase "qu" tile.
+GRIDS = [
+    "R,Z,T,E,O,U,S T,N,S,R,G,I,U A,O,A,Q,M,O,D W,C,A,N,A,K,E "
+    "V,N,S,D,A,R,T N,C,P,I,D,S,L U,O,E,D,E,E,Y",
+    "Qu,I,E,T,S,A,R E,U,Q,N,E,S,T A,Q,U,I,R,E,D S,T,R,E,A,M,S "
+    "R,E,S,T,I,N,G qu,a,r,t,e,r,s L,E,A,R,N,E,R",
+    "S,T,A,R,E,D,L O,N,E,S,I,T,A P,L,A,N,T,E,R E,A,R,T,H,S,O "
+    "D,I,N,E,R,S,T R,O,A,S,T,E,D M,E,L,T,I,N,G",
+]
+
+
+def reference_words(letter_list):
+    words = set()
+    prefixes = set()
+    with open(ROOT / "cleaned_words.txt", encoding="utf-8") as f:
+        for line in f:
+            s = line.strip().lower()
+            if len(s) >= generate_clue.MIN_LEN and s.isalpha():
+                words.add(s)
+                for i in range(1, len(s) + 1):
+                    prefixes.add(s[:i])
+
+    cols = [col.split(",") for col in letter_list.split()]
+    grid = [[""] * 7 for _ in range(7)]
+    for c, col in enumerate(cols):
+        for r, tile in enumerate(col):
+            t = tile.strip().lower()
+            grid[r][c] = "qu" if t in ("q", "qu") else t
+
+    found = set()
+
+    def explore(r, c, word, visited):
+        word += grid[r][c]
+        if word not in prefixes:
+            return
+        if word in words:
+            found.add(word)
+        visited = visited | {(r, c)}
+        for dr, dc in generate_clue.neighbor_offsets(c):
+            nr, nc = r + dr, c + dc
+            if 0 <= nr < 7 and 0 <= nc < 7 and (nr, nc) not in visited:
+                explore(nr, nc, word, visited)
+
+    for r in range(7):
+        for c in range(7):
+            explore(r, c, "", frozenset())
+    return found
+
+
+def expected(letter_list):
+    found = reference_words(letter_list)
+    counts = Counter(w[:2] for w in found)
+    parts = [f"{counts[k]}{k}" for k in sorted(counts)]
+    return len(found), (" ".join(parts) + " ✔️") if parts else "✔️"
+
+
+def test_generate_clue_matches_reference():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = Path(tmp) / "words.trie"
+        # First load builds and writes the cache, second one maps it back.
+        for _ in range(2):
+            trie = generate_clue.load_trie(generate_clue.WORDS_FILE, cache)
+            for letter_list in GRIDS:
+                seen, counts = generate_clue.search(generate_clue.parse_grid(letter_list), trie)
+                assert (len(seen), generate_clue.build_clue(counts)) == expected(letter_list)
+
+
+def test_scroggle_clue_matches_reference():
+    saved = scroggle_clue.CACHE_FILEPATH
+    with tempfile.TemporaryDirectory() as tmp:
+        scroggle_clue.CACHE_FILEPATH = os.path.join(tmp, "words.trie")
+        try:
+            for _ in range(2):
+                tree = scroggle_clue.load_tree(str(ROOT / "cleaned_words.txt"))
+                for letter_list in GRIDS:
+                    seen, counts = scroggle_clue.search(scroggle_clue.parse_grid(letter_list), tree)
+                    assert (len(seen), scroggle_clue.build_line(counts)) == expected(letter_list)
+        finally:
+            scroggle_clue.CACHE_FILEPATH = saved
+
+
+if __name__ == "__main__":
+    test_generate_clue_matches_reference()
+    test_scroggle_clue_matches_reference()
+    print("ok")